@@ -1,15 +1,45 @@
 #!/usr/bin/env python3
 import json
 import csv
+import mmap
+import os
 import argparse
+from collections import deque
 from typing import Any, List, Dict
 
+try:
+    import orjson  # optional: much faster decode of large exports
+except ImportError:
+    orjson = None
+
+# Keys that commonly hold the app list, in priority order.
+CONTAINER_KEYS = ("data", "items", "applications", "private_apps", "result")
+
+def find_app_list(data: Dict[str, Any]) -> Any:
+    """
+    Breadth-first search of the container keys, descending into containers that
+    hold an object (e.g. {"data": {"private_apps": [...]}}). Returns None if no
+    list is found.
+    """
+    pending = deque([data])
+    while pending:
+        obj = pending.popleft()
+        for k in CONTAINER_KEYS:
+            v = obj.get(k)
+            if isinstance(v, list):
+                return v
+            if isinstance(v, dict):
+                pending.append(v)
+    return None
+
 def extract_apps(data: Any) -> List[Dict[str, str]]:
     """
     Extract `app_name` and `host` values from a JSON structure.
     Supports:
       - Top-level list
-      - Objects with "data", "items", "applications" arrays
+      - Objects with "data", "items", "applications" arrays, also nested under
+        further container keys at any depth (e.g. Netskope's
+        {"data": {"private_apps": [...]}}); the shallowest match wins
     """
     rows = []
 
@@ -17,17 +47,10 @@ def extract_apps(data: Any) -> List[Dict[str, str]]:
     if isinstance(data, list):
         items = data
     elif isinstance(data, dict):
-        # try common container keys
-        for k in ["data", "items", "applications", "private_apps", "result"]:
-            if k in data and isinstance(data[k], list):
-                items = data[k]
-                break
-        else:
+        items = find_app_list(data)
+        if items is None:
             # fallback: treat values as possible lists
-            items = []
-            for v in data.values():
-                if isinstance(v, list):
-                    items.extend(v)
+            items = [x for v in data.values() if isinstance(v, list) for x in v]
     else:
         items = []
 
@@ -49,22 +72,32 @@ def extract_apps(data: Any) -> List[Dict[str, str]]:
         })
     return rows
 
+def load_json(path: str) -> Any:
+    """
+    Decode a JSON file. With orjson the file is memory-mapped and parsed in
+    place, so no bytes/str copy of the whole file is held next to the result.
+    """
+    with open(path, "rb") as f:
+        if orjson is None or os.fstat(f.fileno()).st_size == 0:
+            return json.load(f)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
 def main():
     parser = argparse.ArgumentParser(description="Parse JSON for app_name and host fields, export to CSV.")
     parser.add_argument("--in-json", required=True, help="Path to input JSON file.")
     parser.add_argument("--out-csv", default="apps_and_hosts.csv", help="Output CSV path.")
     args = parser.parse_args()
 
-    with open(args.in_json, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load_json(args.in_json)
 
     rows = extract_apps(data)
     print(f"[INFO] Extracted {len(rows)} rows from {args.in_json}")
 
     with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["app_name", "host"])
-        writer.writeheader()
-        writer.writerows(rows)
+        writer = csv.writer(f)
+        writer.writerow(["app_name", "host"])
+        writer.writerows((r["app_name"], r["host"]) for r in rows)
 
     print(f"[INFO] Wrote CSV to {args.out_csv}")
 
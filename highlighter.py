@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
 import argparse
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Set
-from openpyxl import load_workbook
+from typing import Callable, FrozenSet, List, Tuple
+from openpyxl import Workbook, load_workbook
+
+try:
+    import ahocorasick  # optional: speeds up --substring matching
+except ImportError:
+    ahocorasick = None
 
 
 def normalize(s: str, ci: bool) -> str:
@@ -10,14 +17,86 @@ def normalize(s: str, ci: bool) -> str:
     return s.lower() if ci else s
 
 
-def read_targets(path: Path, ci: bool) -> Set[str]:
-    targets = set()
+# Cached per-mode variants of normalize() for the row scan: Column A values
+# repeat a lot, and a cache hit skips the strip/lower allocations entirely.
+# Results are interned like the targets, so set lookups that hit compare by
+# identity instead of character by character (short strings often already are).
+@lru_cache(maxsize=1 << 16)
+def _norm_ci(s: str) -> str:
+    return sys.intern(s.strip().lower())
+
+
+@lru_cache(maxsize=1 << 16)
+def _norm_cs(s: str) -> str:
+    return sys.intern(s.strip())
+
+
+def read_targets(path: Path, ci: bool) -> FrozenSet[str]:
     with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            s = line.strip()
-            if s:
-                targets.add(normalize(s, ci))
-    return targets
+        return frozenset(sys.intern(normalize(line, ci)) for line in f if line.strip())
+
+
+def build_matcher(targets: FrozenSet[str], substring: bool) -> Callable[[str], bool]:
+    """
+    Return a predicate for a normalized Column A value: exact membership by
+    default, or "contains any target" when substring is set (one Aho-Corasick
+    pass per value if pyahocorasick is installed, a plain scan otherwise).
+    """
+    if not substring:
+        return targets.__contains__
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for t in targets:
+            automaton.add_word(t, t)
+        automaton.make_automaton()
+        return lambda s: next(automaton.iter(s), None) is not None
+    return lambda s: any(t in s for t in targets)
+
+
+def stream_marked_copy(
+    xlsx: Path,
+    out: Path,
+    sheet_name: str | None,
+    is_match: Callable[[str], bool],
+    case_insensitive: bool,
+    has_header: bool,
+    clear_existing_f: bool,
+) -> Tuple[str, int, int]:
+    """
+    Copy the sheet row by row from a read-only workbook into a write-only one,
+    setting Column F to "YES" on matching rows. Memory stays flat regardless of
+    sheet size, but styles, formulas (cached values are written instead) and
+    other sheets are not carried over.
+    Returns (sheet title, rows scanned, rows marked).
+    """
+    src = load_workbook(filename=str(xlsx), read_only=True, data_only=True)
+    try:
+        src_ws = src[sheet_name] if sheet_name else src.active
+        src_ws.reset_dimensions()  # don't trust the stored <dimension>; read to the real end
+        dst = Workbook(write_only=True)
+        dst_ws = dst.create_sheet(src_ws.title)
+
+        start_row = 2 if has_header else 1
+        norm = _norm_ci if case_insensitive else _norm_cs
+        scanned = 0
+        found_count = 0
+        for r, row in enumerate(src_ws.iter_rows(values_only=True), start=1):
+            match = False
+            if r >= start_row and row and row[0] is not None:
+                scanned += 1
+                match = is_match(norm(str(row[0])))
+            if match or (clear_existing_f and r >= start_row and len(row) >= 6):
+                row = list(row) + [None] * (6 - len(row))
+                row[5] = "YES" if match else None  # Column F
+            if match:
+                found_count += 1
+            dst_ws.append(row)
+        title = src_ws.title
+    finally:
+        src.close()
+
+    dst.save(str(out))
+    return title, scanned, found_count
 
 
 def mark_yes_in_col_f(
@@ -28,33 +107,57 @@ def mark_yes_in_col_f(
     case_insensitive: bool,
     has_header: bool,
     clear_existing_f: bool,
+    write_only: bool = False,
+    substring: bool = False,
 ) -> None:
     targets = read_targets(lines_path, case_insensitive)
     if not targets:
         print("[WARN] No targets found in lines file (after trimming). Exiting.")
         return
+    is_match = build_matcher(targets, substring)
+
+    if write_only:
+        title, scanned, found_count = stream_marked_copy(
+            xlsx, out, sheet_name, is_match, case_insensitive, has_header, clear_existing_f
+        )
+        print(f"[INFO] Sheet: '{title}' (write-only copy; formatting not preserved)")
+        print(f"[INFO] Targets loaded: {len(targets)}")
+        print(f"[INFO] Rows scanned (Column A): {scanned}")
+        print(f"[INFO] Rows marked YES in Column F: {found_count}")
+        print(f"[INFO] Output written to: {out}")
+        return
+
+    start_row = 2 if has_header else 1
 
+    # Phase 1: stream Column A from a read-only workbook so openpyxl never
+    # builds Cell objects for the whole sheet; only remember matching rows.
+    wb_ro = load_workbook(filename=str(xlsx), read_only=True, data_only=True)
+    try:
+        ws_ro = wb_ro[sheet_name] if sheet_name else wb_ro.active
+        ws_ro.reset_dimensions()  # don't trust the stored <dimension>; read to the real end
+        norm = _norm_ci if case_insensitive else _norm_cs
+        scanned = 0
+        hits: List[int] = []
+        for r, (a_val,) in enumerate(ws_ro.iter_rows(min_col=1, max_col=1, values_only=True), start=1):
+            if r < start_row or a_val is None:
+                continue
+            scanned += 1
+            if is_match(norm(str(a_val))):
+                hits.append(r)
+    finally:
+        wb_ro.close()
+
+    # Phase 2: open the editable workbook and only touch the matched rows.
     wb = load_workbook(filename=str(xlsx))
     ws = wb[sheet_name] if sheet_name else wb.active
 
-    start_row = 2 if has_header else 1
-    max_row = ws.max_row
-
     if clear_existing_f:
-        for r in range(start_row, max_row + 1):
+        for r in range(start_row, ws.max_row + 1):
             ws.cell(row=r, column=6).value = None  # Column F
 
-    found_count = 0
-    scanned = 0
-
-    for r in range(start_row, max_row + 1):
-        a_val = ws.cell(row=r, column=1).value  # Column A
-        if a_val is None:
-            continue
-        scanned += 1
-        if normalize(str(a_val), case_insensitive) in targets:
-            ws.cell(row=r, column=6).value = "YES"  # Column F
-            found_count += 1
+    for r in hits:
+        ws.cell(row=r, column=6).value = "YES"  # Column F
+    found_count = len(hits)
 
     wb.save(str(out))
     print(f"[INFO] Sheet: '{ws.title}'")
@@ -73,6 +176,10 @@ def main():
     p.add_argument("--case-insensitive", action="store_true", help="Case-insensitive matching.")
     p.add_argument("--has-header", action="store_true", help="Treat row 1 as header (start from row 2).")
     p.add_argument("--clear-f", action="store_true", help="Clear Column F before marking YES.")
+    p.add_argument("--substring", action="store_true",
+                   help="Match when Column A contains any line as a substring (uses pyahocorasick if installed).")
+    p.add_argument("--write-only", action="store_true",
+                   help="Stream a values-only copy of the sheet (low memory; drops formatting and other sheets).")
     args = p.parse_args()
 
     xlsx = Path(args.xlsx)
@@ -86,6 +193,8 @@ def main():
         case_insensitive=args.case_insensitive,
         has_header=args.has_header,
         clear_existing_f=args.clear_f,
+        write_only=args.write_only,
+        substring=args.substring,
     )
 
 
@@ -1,18 +1,138 @@
 #!/usr/bin/env python3
-import argparse, json, sys
-from typing import Any, Dict, List, Set
-import requests, pandas as pd
+import argparse, csv, json, os, sys, time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def fetch(url: str, headers: Dict[str, str], verify_tls: bool = True, timeout: int = 30) -> Any:
-    print(f"[INFO] Calling Netskope API: {url}")
-    r = requests.get(url, headers=headers, verify=verify_tls, timeout=timeout)
+try:
+    import orjson  # optional: faster decode/encode of large payloads
+except ImportError:
+    orjson = None
+
+try:
+    import httpx  # optional: only needed for --http2
+    import h2  # noqa: F401 -- httpx's HTTP/2 support (httpx[http2]); Client(http2=True) fails without it
+except ImportError:
+    httpx = None
+
+try:
+    import ijson  # optional: only needed for --stream-key
+except ImportError:
+    ijson = None
+
+CSV_COLUMNS = ["Application Name", "Destination Hostnames", "App ID"]
+Row = Tuple[str, str, str]  # one CSV row, in CSV_COLUMNS order
+NAME_KEYS = ("app_name", "name", "application_name", "display_name", "label")
+ID_KEYS = ("id", "app_id", "uuid", "guid")
+LIST_KEYS = ("data", "items", "result", "private_apps", "applications")
+MAX_WORKERS = 8
+# Retry policy for transient failures, shared by the requests and httpx clients
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.2
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+def make_session(pool_size: int = 1) -> requests.Session:
+    """
+    Session that keeps up to pool_size keep-alive connections per host (the
+    default pool of 10 would drop and later re-handshake any beyond that) and
+    retries connection errors and 429/5xx responses with a short backoff.
+    """
+    retry = Retry(total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF, status_forcelist=RETRY_STATUSES,
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def _httpx_get(client: Any, url: str, **kwargs: Any) -> Any:
+    """GET with make_session's retry policy; httpx itself only retries failed connects."""
+    for attempt in range(RETRY_TOTAL + 1):
+        delay = RETRY_BACKOFF * 2 ** attempt
+        try:
+            r = client.get(url, **kwargs)
+        except httpx.TransportError:
+            if attempt == RETRY_TOTAL:
+                raise
+        else:
+            if r.status_code not in RETRY_STATUSES or attempt == RETRY_TOTAL:
+                return r
+            retry_after = r.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = int(retry_after)
+        time.sleep(delay)
+
+def fetch(url: str, headers: Dict[str, str], verify_tls: bool = True, timeout: int = 30,
+          params: Optional[Dict[str, Any]] = None, session: Any = None) -> Any:
+    """`session` may be a requests.Session or an httpx.Client (which carries its own TLS setting)."""
+    print(f"[INFO] Calling Netskope API: {url}" + (f" {params}" if params else ""))
+    kwargs: Dict[str, Any] = {"headers": headers, "params": params, "timeout": timeout}
+    if httpx is not None and isinstance(session, httpx.Client):
+        r = _httpx_get(session, url, **kwargs)
+    else:
+        r = (session or requests).get(url, verify=verify_tls, **kwargs)
     print(f"[INFO] HTTP status: {r.status_code}")
-    if r.ok:
+    if r.status_code < 400:
         print("[INFO] API call successful.")
     else:
         print(f"[ERROR] API call failed: {r.text[:500]}")
         r.raise_for_status()
-    return r.json()
+    return orjson.loads(r.content) if orjson else r.json()
+
+def _total_pages(payload: Any) -> Optional[int]:
+    if not isinstance(payload, dict):
+        return None
+    for container in (payload, payload.get("meta"), payload.get("pagination")):
+        if isinstance(container, dict):
+            for key in ("total_pages", "totalPages"):
+                v = container.get(key)
+                if isinstance(v, int) and v > 0:
+                    return v
+    return None
+
+def fetch_all_pages(url: str, headers: Dict[str, str], page_param: str, verify_tls: bool = True,
+                    timeout: int = 30, workers: int = MAX_WORKERS, http2: bool = False) -> List[Any]:
+    """
+    Fetch page 1, read the reported total page count, then fetch the remaining
+    pages concurrently over one shared Session (or one multiplexed HTTP/2 httpx
+    Client when http2 is set). Pages are returned in order.
+    """
+    client = httpx.Client(http2=True, verify=verify_tls, follow_redirects=True) if http2 else make_session(workers)
+    with client as session:
+        def get_page(page: int) -> Any:
+            return fetch(url, headers, verify_tls, timeout, params={page_param: page}, session=session)
+
+        pages = [get_page(1)]
+        total = _total_pages(pages[0])
+        if total is None:
+            print("[WARN] Response does not report total_pages; only page 1 was fetched.")
+        elif total > 1:
+            print(f"[INFO] {total} pages reported; fetching pages 2-{total} with {workers} workers.")
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                pages.extend(ex.map(get_page, range(2, total + 1)))
+    return pages
+
+def iter_items_streaming(url: str, headers: Dict[str, str], key: str,
+                         verify_tls: bool = True, timeout: int = 30) -> Iterator[Dict[str, Any]]:
+    """Yield app objects one at a time from the array at `key` ("." for a top-level list)."""
+    print(f"[INFO] Calling Netskope API (streaming): {url}")
+    with make_session() as session, \
+            session.get(url, headers=headers, verify=verify_tls, timeout=timeout, stream=True) as r:
+        print(f"[INFO] HTTP status: {r.status_code}")
+        if not r.ok:
+            print(f"[ERROR] API call failed: {r.text[:500]}")
+            r.raise_for_status()
+        r.raw.decode_content = True
+        prefix = "item" if key == "." else f"{key}.item"
+        count = 0
+        for item in ijson.items(r.raw, prefix, use_float=True):
+            count += 1
+            yield item
+        if not count:
+            print(f"[WARN] Could not locate app list in JSON payload (nothing under '{key}').")
 
 def extract_items(payload: Any) -> List[Dict[str, Any]]:
     if isinstance(payload, list):
@@ -20,53 +140,97 @@ def extract_items(payload: Any) -> List[Dict[str, Any]]:
         return payload
     if isinstance(payload, dict):
         print(f"[DEBUG] Top-level JSON is a dict with keys: {list(payload.keys())}")
-        for key in ("data", "items", "result", "private_apps", "applications"):
+        for key in LIST_KEYS:
             v = payload.get(key)
-            if isinstance(v, list):
+            if v.__class__ is list:
                 print(f"[INFO] Found list of apps under key '{key}' with {len(v)} items.")
                 return v
         # fallback: first list of dicts
-        for k, v in payload.items():
-            if isinstance(v, list) and v and isinstance(v[0], dict):
-                print(f"[INFO] Found list of dicts under key '{k}' with {len(v)} items.")
-                return v
+        found = next(((k, v) for k, v in payload.items()
+                      if v.__class__ is list and v and v[0].__class__ is dict), None)
+        if found:
+            k, v = found
+            print(f"[INFO] Found list of dicts under key '{k}' with {len(v)} items.")
+            return v
     print("[WARN] Could not locate app list in JSON payload.")
     return []
 
+@lru_cache(maxsize=1 << 16)
+def _collapse_ws(s: str) -> str:
+    # Hostnames repeat heavily across apps, so cache the split/join.
+    return " ".join(s.split())
+
 def harvest_hosts(obj: Any) -> Set[str]:
+    # Every non-empty string reachable through dicts/lists is collected, so a
+    # single pass over each dict's values covers the host/container keys too.
+    # Decoded JSON only holds exact builtin types, so dispatch on the class;
+    # scalars pushed along with dict values are simply dropped when popped.
     out: Set[str] = set()
-    def walk(v: Any):
-        if v is None: return
-        if isinstance(v, str):
-            s = v.strip()
-            if s: out.add(s); return
-        if isinstance(v, list):
-            for x in v: walk(x); return
-        if isinstance(v, dict):
-            for k in ("fqdn","hostname","host","domain","destination","destination_fqdn"):
-                if k in v: walk(v[k])
-            for k in ("destinations","resources","domains"):
-                if k in v: walk(v[k])
-            for vv in v.values():
-                if isinstance(vv, (dict, list, str)): walk(vv)
-    walk(obj)
+    stack = [obj]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        v = pop()
+        t = v.__class__
+        if t is str:
+            s = _collapse_ws(v)
+            if s: out.add(s)
+        elif t is dict:
+            extend(v.values())
+        elif t is list:
+            extend(v)
     return out
 
-def row_from_app(app: Dict[str, Any]) -> Dict[str, str]:
-    name = ""
-    for k in ("app_name", "name", "application_name", "display_name", "label"):
-        if isinstance(app.get(k), str) and app[k].strip():
-            name = " ".join(app[k].split()).strip(); break
-    app_id = ""
-    for k in ("id","app_id","uuid","guid"):
-        if k in app and app[k] is not None:
-            app_id = str(app[k]); break
-    hosts = sorted({ " ".join(h.split()).strip() for h in harvest_hosts(app) if h })
-    return {
-        "Application Name": name,
-        "Destination Hostnames": ", ".join(hosts),
-        "App ID": app_id
-    }
+def _pick_key(app: Dict[str, Any], candidates: Tuple[str, ...], want_str: bool = False) -> Optional[str]:
+    """Return the first candidate key holding a usable value (a non-blank string if want_str)."""
+    for k in candidates:
+        v = app.get(k)
+        if want_str:
+            if isinstance(v, str) and v.strip():
+                return k
+        elif v is not None:
+            return k
+    return None
+
+def row_from_app(app: Dict[str, Any]) -> Row:
+    k = _pick_key(app, NAME_KEYS, want_str=True)
+    name = app[k] if k else ""
+    k = _pick_key(app, ID_KEYS)
+    app_id = app[k] if k else ""
+    hosts = sorted(harvest_hosts(app))
+    return (_collapse_ws(name), ", ".join(hosts), str(app_id))
+
+def rows_from_apps(apps: Iterable[Any]) -> Iterator[Row]:
+    for app in apps:
+        if isinstance(app, dict):
+            yield row_from_app(app)
+
+def export_to_csv(rows: Iterable[Row], out_csv: str, sort: bool = True) -> int:
+    """
+    Write rows (sorted by name unless sort=False); returns the row count.
+    Rows may be a lazy stream (e.g. --stream-key --no-sort), so they are written
+    to a temporary file that only replaces out_csv once the stream completes;
+    a failed request or a broken stream leaves any existing export untouched.
+    """
+    if sort:
+        rows = sorted(rows, key=lambda r: r[0].lower())
+    n = 0
+    def counted(it: Iterable[Row]) -> Iterator[Row]:
+        nonlocal n
+        for r in it:
+            n += 1
+            yield r
+    tmp_csv = out_csv + ".tmp"
+    try:
+        with open(tmp_csv, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+            w = csv.writer(f, lineterminator="\n")  # same line endings as the old pandas to_csv
+            w.writerow(CSV_COLUMNS)
+            w.writerows(counted(rows))  # streams any iterable; rows are never all held here
+    except BaseException:
+        if os.path.exists(tmp_csv):
+            os.remove(tmp_csv)
+        raise
+    os.replace(tmp_csv, out_csv)
+    return n
 
 def main():
     ap = argparse.ArgumentParser(description="Export Netskope NPA Private Applications to CSV (uses app_name).")
@@ -75,26 +239,64 @@ def main():
     ap.add_argument("--token-header", default="Netskope-Api-Token",
                    help='Header name for token (default Netskope-Api-Token; use "Authorization" for Bearer).')
     ap.add_argument("--out-csv", default="netskope_npa_private_apps.csv", help="CSV output path.")
-    ap.add_argument("--raw-json", default=None, help="Optional: save raw JSON to this path.")
+    ap.add_argument("--raw-json", default=None,
+                   help="Optional: save raw JSON to this path. With --page-param and more than one page, "
+                        "this is a JSON array holding each page's response in page order.")
     ap.add_argument("--insecure", action="store_true", help="Disable TLS verification.")
+    ap.add_argument("--stream-key", default=None,
+                   help='Stream apps from this dotted key path (e.g. "data" or "data.private_apps"; '
+                        '"." for a top-level list) instead of loading the whole response. Requires ijson.')
+    ap.add_argument("--page-param", default=None,
+                   help='Query parameter for page-number pagination (e.g. "page"). Pages after the first are '
+                        'fetched concurrently when the response reports total_pages.')
+    ap.add_argument("--workers", type=int, default=MAX_WORKERS,
+                   help=f"With --page-param, number of pages fetched concurrently (default {MAX_WORKERS}).")
+    ap.add_argument("--http2", action="store_true",
+                   help="With --page-param, fetch pages over one multiplexed HTTP/2 connection. Requires httpx[http2].")
+    ap.add_argument("--no-sort", action="store_true",
+                   help="Keep API order instead of sorting by name; with --stream-key rows are written as they arrive.")
     args = ap.parse_args()
 
     headers = {args.token_header: args.token}
-    payload = fetch(args.url, headers, verify_tls=not args.insecure)
 
-    if args.raw_json:
-        with open(args.raw_json, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2, ensure_ascii=False)
-        print(f"[INFO] Raw JSON written to {args.raw_json}")
+    if args.stream_key:
+        if ijson is None:
+            ap.error("--stream-key requires the 'ijson' package.")
+        if args.raw_json or args.page_param:
+            ap.error("--stream-key cannot be combined with --raw-json or --page-param.")
+    if args.workers < 1:
+        ap.error("--workers must be at least 1.")
+    if args.http2:
+        if not args.page_param:
+            ap.error("--http2 only applies to paginated fetches (--page-param).")
+        if httpx is None:
+            ap.error("--http2 requires the 'httpx[http2]' package.")
+
+    if args.stream_key:
+        items = iter_items_streaming(args.url, headers, args.stream_key, verify_tls=not args.insecure)
+    else:
+        if args.page_param:
+            pages = fetch_all_pages(args.url, headers, args.page_param, verify_tls=not args.insecure,
+                                    workers=args.workers, http2=args.http2)
+        else:
+            with make_session() as session:
+                pages = [fetch(args.url, headers, verify_tls=not args.insecure, session=session)]
+        payload = pages[0] if len(pages) == 1 else pages
+
+        if args.raw_json:
+            if orjson:
+                with open(args.raw_json, "wb") as f:
+                    f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+            else:
+                with open(args.raw_json, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, indent=2, ensure_ascii=False)
+            print(f"[INFO] Raw JSON written to {args.raw_json}")
 
-    items = extract_items(payload)
-    print(f"[INFO] Extracted {len(items)} app objects from payload.")
+        items = [item for page in pages for item in extract_items(page)]
+        print(f"[INFO] Extracted {len(items)} app objects from payload.")
 
-    rows = [row_from_app(app) for app in items]
-    df = pd.DataFrame(rows, columns=["Application Name","Destination Hostnames","App ID"])
-    df = df.sort_values(by="Application Name", key=lambda s: s.str.lower(), kind="mergesort")
-    df.to_csv(args.out_csv, index=False)
-    print(f"[INFO] Exported {len(df)} rows to {args.out_csv}")
+    n = export_to_csv(rows_from_apps(items), args.out_csv, sort=not args.no_sort)
+    print(f"[INFO] Exported {n} rows to {args.out_csv}")
 
 if __name__ == "__main__":
     main()
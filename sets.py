@@ -7,35 +7,42 @@ infile = "input.csv"
 outfile_a = "a_not_b.txt"
 outfile_b = "b_not_a.txt"
 
-col_a_vals = []
-col_b_vals = []
+# How many values of each difference to echo to the console (full lists go to the files)
+preview = 10
 
-with open(infile, newline='', encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        col_a_vals.append(row[reader.fieldnames[0]].strip())
-        col_b_vals.append(row[reader.fieldnames[1]].strip())
+set_a = set()
+set_b = set()
+add_a = set_a.add
+add_b = set_b.add
 
-set_a = set(col_a_vals)
-set_b = set(col_b_vals)
+with open(infile, newline='', encoding="utf-8", buffering=1 << 20) as f:
+    reader = csv.reader(f)
+    next(reader, None)  # header row
+    for row in reader:
+        if not row:  # blank line (DictReader skipped these too)
+            continue
+        add_a(row[0].strip())
+        add_b(row[1].strip())
 
 a_not_b = sorted(set_a - set_b)
 b_not_a = sorted(set_b - set_a)
 
-print("Values in Column A but not in Column B:")
-print(a_not_b)
+print(f"Values in Column A but not in Column B: {len(a_not_b)}")
+for item in a_not_b[:preview]:
+    print(f"  {item}")
 
-print("\nValues in Column B but not in Column A:")
-print(b_not_a)
+print(f"\nValues in Column B but not in Column A: {len(b_not_a)}")
+for item in b_not_a[:preview]:
+    print(f"  {item}")
 
 # Write each list to a separate text file
 with open(outfile_a, "w", encoding="utf-8") as f:
-    for item in a_not_b:
-        f.write(item + "\n")
+    if a_not_b:
+        f.write("\n".join(a_not_b) + "\n")
 
 with open(outfile_b, "w", encoding="utf-8") as f:
-    for item in b_not_a:
-        f.write(item + "\n")
+    if b_not_a:
+        f.write("\n".join(b_not_a) + "\n")
 
 print(f"\n[INFO] Wrote {len(a_not_b)} values to {outfile_a}")
 print(f"[INFO] Wrote {len(b_not_a)} values to {outfile_b}")